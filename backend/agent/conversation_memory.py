@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# A fact stored under this doc_id depends on every document (e.g. the
+# document list) and is dropped whenever any document changes.
+ALL_DOCUMENTS = "*"
+
+TRUNCATED_MARKER = " ... [truncated preview; call the tool again for the full result]"
+
+def documents_signature(versions: Dict[str, int]) -> str:
+    return hashlib.sha1(json.dumps(sorted(versions.items())).encode()).hexdigest()
+
+def _fact_version(doc_id: str, versions: Dict[str, int]) -> Optional[str]:
+    if doc_id == ALL_DOCUMENTS:
+        return documents_signature(versions)
+    if doc_id in versions:
+        return str(versions[doc_id])
+    return None
+
+class ConversationMemory:
+    def __init__(self, db_path: str = "data/memory.db", window: int = 5, max_facts: int = 10,
+                 max_bytes_per_user: int = 64_000, turn_chars: int = 300, fact_chars: int = 300):
+        self.window = window
+        self.max_facts = max_facts
+        self.max_bytes_per_user = max_bytes_per_user
+        self.turn_chars = turn_chars
+        self.fact_chars = fact_chars
+        
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Facts are only a cache; drop tables from before facts were versioned.
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(facts)")]
+        if columns and "version" not in columns:
+            self._conn.execute("DROP TABLE facts")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user TEXT NOT NULL,
+                query TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_turns_user ON turns (user, id);
+            CREATE TABLE IF NOT EXISTS facts (
+                user TEXT NOT NULL,
+                key TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                content TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (user, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_facts_user ON facts (user, updated_at);
+            CREATE INDEX IF NOT EXISTS idx_facts_doc ON facts (doc_id);
+        """)
+        self._conn.commit()
+        logger.info(f"Conversation memory initialized at {db_path}")
+    
+    def render(self, user: str, versions: Optional[Dict[str, int]] = None) -> str:
+        # Facts are only shown when the caller passes the current document
+        # versions; any fact recorded against another version is dropped, so
+        # writes made outside this agent cannot leave stale content behind.
+        # Callers pass None when the user may not see document content.
+        with self._lock:
+            turns = self._conn.execute(
+                "SELECT query, answer FROM turns WHERE user = ? ORDER BY id DESC LIMIT ?",
+                (user, self.window)
+            ).fetchall()
+            
+            facts = []
+            if versions is not None:
+                stale = []
+                rows = self._conn.execute(
+                    "SELECT key, doc_id, version, content FROM facts WHERE user = ? ORDER BY updated_at DESC",
+                    (user,)
+                ).fetchall()
+                for key, doc_id, version, content in rows:
+                    if _fact_version(doc_id, versions) == version:
+                        facts.append(content)
+                    else:
+                        stale.append((user, key))
+                if stale:
+                    self._conn.executemany("DELETE FROM facts WHERE user = ? AND key = ?", stale)
+                    self._conn.commit()
+        
+        sections = []
+        if facts:
+            lines = [f"- {content}" for content in facts[:self.max_facts]]
+            sections.append("Known facts from earlier tool results:\n" + "\n".join(lines))
+        if turns:
+            lines = []
+            for query, answer in reversed(turns):
+                lines.append(f"User: {query[:self.turn_chars]}")
+                lines.append(f"Assistant: {answer[:self.turn_chars]}")
+            sections.append("Recent conversation:\n" + "\n".join(lines))
+        
+        return "\n\n".join(sections)
+    
+    def add_turn(self, user: str, query: str, answer: str):
+        size = len(query) + len(answer)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO turns (user, query, answer, size, created_at) VALUES (?, ?, ?, ?, ?)",
+                (user, query, answer, size, time.time())
+            )
+            self._evict_turns(user)
+            self._conn.commit()
+    
+    def _evict_turns(self, user: str):
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM turns WHERE user = ?", (user,)).fetchone()
+        if total <= self.max_bytes_per_user:
+            return
+        
+        cutoff = None
+        for turn_id, size in self._conn.execute("SELECT id, size FROM turns WHERE user = ? ORDER BY id", (user,)):
+            total -= size
+            cutoff = turn_id
+            if total <= self.max_bytes_per_user:
+                break
+        
+        # The newest turn is kept even if it alone is over the limit.
+        (newest,) = self._conn.execute("SELECT MAX(id) FROM turns WHERE user = ?", (user,)).fetchone()
+        cutoff = min(cutoff, newest - 1)
+        self._conn.execute("DELETE FROM turns WHERE user = ? AND id <= ?", (user, cutoff))
+        logger.info(f"Evicted conversation memory for {user} up to turn {cutoff}")
+    
+    def remember_fact(self, user: str, key: str, doc_id: str, version: str, content: str):
+        if len(content) > self.fact_chars:
+            content = content[:max(self.fact_chars - len(TRUNCATED_MARKER), 0)] + TRUNCATED_MARKER
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO facts (user, key, doc_id, version, content, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (user, key, doc_id, version, content, time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM facts WHERE user = ? AND key NOT IN "
+                "(SELECT key FROM facts WHERE user = ? ORDER BY updated_at DESC LIMIT ?)",
+                (user, user, self.max_facts)
+            )
+            self._conn.commit()
+    
+    def forget_facts(self, user: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM facts WHERE user = ?", (user,))
+            self._conn.commit()
+    
+    def invalidate_document(self, doc_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM facts WHERE doc_id IN (?, ?)", (doc_id, ALL_DOCUMENTS))
+            self._conn.commit()
+    
+    def facts(self, user: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content FROM facts WHERE user = ? ORDER BY updated_at DESC", (user,)
+            ).fetchall()
+        return [content for (content,) in rows]
+    
+    def clear(self, user: Optional[str] = None):
+        with self._lock:
+            if user is None:
+                self._conn.execute("DELETE FROM turns")
+                self._conn.execute("DELETE FROM facts")
+            else:
+                self._conn.execute("DELETE FROM turns WHERE user = ?", (user,))
+                self._conn.execute("DELETE FROM facts WHERE user = ?", (user,))
+            self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,54 +2,125 @@ import asyncio
 import json
 import logging
 import os
-from typing import Dict, Any
-from langchain.agents import AgentExecutor, create_react_agent, Tool
-from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from backend.mcp.mcp_client import MCPClient
+from backend.agent.observation_compactor import ObservationCompactor
+from backend.agent.conversation_memory import ConversationMemory, ALL_DOCUMENTS, documents_signature
+from backend.storage.document_storage import DocumentStorage
+
+if TYPE_CHECKING:
+    from backend.rbac.rbac_manager import RBACManager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class LangChainMCPAgent:
-    def __init__(self, current_user: str = "alice"):
-        self.current_user = current_user
+# One compactor per query; a context variable keeps concurrent queries for the
+# same user from sharing budgets or stored payloads.
+_compactor: ContextVar[Optional[ObservationCompactor]] = ContextVar("observation_compactor", default=None)
+
+# The LLM, MCP client, tools and executor are built once per process and
+# shared by every user. Tools read the calling user from this context variable,
+# which LangChainMCPAgent.run binds for the duration of a query.
+_current_user: ContextVar[Optional[str]] = ContextVar("current_user", default=None)
+
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://127.0.0.1:8765")
+
+_runtime: Optional["AgentRuntime"] = None
+_runtime_lock: Optional[asyncio.Lock] = None
+
+class AgentRuntime:
+    def __init__(self):
         self.mcp_client = None
+        self.memory = None
+        self.documents = None
         self.llm = None
         self.tools = []
         self.agent_executor = None
     
     async def initialize(self):
+        # Importing langchain and compiling the agent takes a while; do it off
+        # the event loop so a background warm-up does not stall requests.
+        try:
+            await asyncio.to_thread(self._build)
+            
+            self.mcp_client = MCPClient(base_url=MCP_SERVER_URL)
+            await self.mcp_client.connect()
+            logger.info("MCP Client connected successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize agent runtime: {e}")
+            # Release whatever was built so a retry does not leak connections.
+            await self.close()
+            raise
+        
+        logger.info("LangChain agent runtime initialized")
+    
+    def _build(self):
+        from langchain_openai import ChatOpenAI
+        
         self.llm = ChatOpenAI(
             model="gpt-4o",
             temperature=0,
             openai_api_key=os.getenv("OPENAI_API_KEY"),
             request_timeout=30
         )
-        
-        self.mcp_client = MCPClient(base_url="http://127.0.0.1:8765")
-        try:
-            await self.mcp_client.connect()
-            logger.info("MCP Client connected successfully")
-        except Exception as e:
-            logger.error(f"Failed to connect to MCP server: {e}")
-            raise
+        self.memory = ConversationMemory()
+        # Read-only view of the MCP server's document index, used to check
+        # cached facts against current document versions.
+        self.documents = DocumentStorage()
         
         self._create_langchain_tools()
         self._create_react_agent()
+    
+    def _observe(self, result: Dict[str, Any]) -> str:
+        compactor = _compactor.get()
+        if compactor is None:
+            return json.dumps(result)
+        return compactor.compact(result)
+    
+    def _remember(self, tool: str, params: Dict[str, Any], result: Dict[str, Any]):
+        if result.get("status") != "success":
+            return
         
-        logger.info(f"LangChain Agent initialized for user: {self.current_user}")
+        if tool in ("create_document", "update_document", "delete_document"):
+            self.memory.invalidate_document(params["doc_id"])
+        elif tool == "read_document":
+            doc = result.get("data", {})
+            version = doc.get("version", 1)
+            self.memory.remember_fact(
+                _current_user.get(),
+                f"read:{params['doc_id']}",
+                params["doc_id"],
+                str(version),
+                f"Document '{params['doc_id']}' (version {version}) content: {doc.get('content', '')}"
+            )
+        elif tool == "list_documents":
+            ids = [doc["id"] for doc in result.get("data", [])]
+            versions = self.documents.current_versions()
+            # Only cache the list if nothing changed since the server built it.
+            if set(ids) != set(versions):
+                return
+            self.memory.remember_fact(
+                _current_user.get(),
+                "list",
+                ALL_DOCUMENTS,
+                documents_signature(versions),
+                f"Existing documents: {', '.join(ids) if ids else 'none'}"
+            )
     
     def _create_langchain_tools(self):
+        from langchain.agents import Tool
+        
         async def create_document_func(tool_input: str) -> str:
             try:
                 params = json.loads(tool_input)
                 result = await self.mcp_client.create_document(
-                    user=self.current_user,
+                    user=_current_user.get(),
                     doc_id=params["doc_id"],
                     content=params["content"]
                 )
-                return json.dumps(result)
+                self._remember("create_document", params, result)
+                return self._observe(result)
             except Exception as e:
                 return json.dumps({"status": "error", "message": str(e)})
         
@@ -57,10 +128,11 @@ class LangChainMCPAgent:
             try:
                 params = json.loads(tool_input)
                 result = await self.mcp_client.read_document(
-                    user=self.current_user,
+                    user=_current_user.get(),
                     doc_id=params["doc_id"]
                 )
-                return json.dumps(result)
+                self._remember("read_document", params, result)
+                return self._observe(result)
             except Exception as e:
                 return json.dumps({"status": "error", "message": str(e)})
         
@@ -68,11 +140,12 @@ class LangChainMCPAgent:
             try:
                 params = json.loads(tool_input)
                 result = await self.mcp_client.update_document(
-                    user=self.current_user,
+                    user=_current_user.get(),
                     doc_id=params["doc_id"],
                     content=params["content"]
                 )
-                return json.dumps(result)
+                self._remember("update_document", params, result)
+                return self._observe(result)
             except Exception as e:
                 return json.dumps({"status": "error", "message": str(e)})
         
@@ -80,17 +153,42 @@ class LangChainMCPAgent:
             try:
                 params = json.loads(tool_input)
                 result = await self.mcp_client.delete_document(
-                    user=self.current_user,
+                    user=_current_user.get(),
                     doc_id=params["doc_id"]
                 )
-                return json.dumps(result)
+                self._remember("delete_document", params, result)
+                return self._observe(result)
+            except Exception as e:
+                return json.dumps({"status": "error", "message": str(e)})
+        
+        async def get_version_func(tool_input: str) -> str:
+            try:
+                params = json.loads(tool_input)
+                result = await self.mcp_client.get_version(
+                    user=_current_user.get(),
+                    doc_id=params["doc_id"],
+                    version=params["version"]
+                )
+                return self._observe(result)
+            except Exception as e:
+                return json.dumps({"status": "error", "message": str(e)})
+        
+        async def list_versions_func(tool_input: str) -> str:
+            try:
+                params = json.loads(tool_input)
+                result = await self.mcp_client.list_versions(
+                    user=_current_user.get(),
+                    doc_id=params["doc_id"]
+                )
+                return self._observe(result)
             except Exception as e:
                 return json.dumps({"status": "error", "message": str(e)})
         
         async def list_documents_func(tool_input: str) -> str:
             try:
-                result = await self.mcp_client.list_documents(user=self.current_user)
-                return json.dumps(result)
+                result = await self.mcp_client.list_documents(user=_current_user.get())
+                self._remember("list_documents", {}, result)
+                return self._observe(result)
             except Exception as e:
                 return json.dumps({"status": "error", "message": str(e)})
         
@@ -98,10 +196,20 @@ class LangChainMCPAgent:
             try:
                 params = json.loads(tool_input)
                 result = await self.mcp_client.check_permission(
-                    user=self.current_user,
+                    user=_current_user.get(),
                     action=params["action"]
                 )
-                return json.dumps(result)
+                return self._observe(result)
+            except Exception as e:
+                return json.dumps({"status": "error", "message": str(e)})
+        
+        async def get_observation_func(tool_input: str) -> str:
+            try:
+                params = json.loads(tool_input)
+                compactor = _compactor.get()
+                if compactor is None:
+                    return json.dumps({"status": "error", "message": "No stored observations"})
+                return compactor.fetch(params["ref"], int(params.get("offset", 0)))
             except Exception as e:
                 return json.dumps({"status": "error", "message": str(e)})
         
@@ -130,6 +238,18 @@ class LangChainMCPAgent:
                 func=lambda x: asyncio.run(delete_document_func(x)),
                 coroutine=delete_document_func
             ),
+            Tool(
+                name="get_version",
+                description='Read a previous version of a document. Input must be JSON: {"doc_id": "document-id", "version": 1}',
+                func=lambda x: asyncio.run(get_version_func(x)),
+                coroutine=get_version_func
+            ),
+            Tool(
+                name="list_versions",
+                description='List the version history of a document. Input must be JSON: {"doc_id": "document-id"}',
+                func=lambda x: asyncio.run(list_versions_func(x)),
+                coroutine=list_versions_func
+            ),
             Tool(
                 name="list_documents",
                 description='List all documents. Input should be empty JSON: {}',
@@ -141,10 +261,19 @@ class LangChainMCPAgent:
                 description='Check if current user has permission for an action. Input must be JSON: {"action": "create|read|update|delete"}',
                 func=lambda x: asyncio.run(check_permission_func(x)),
                 coroutine=check_permission_func
+            ),
+            Tool(
+                name="get_observation",
+                description='Read more of a truncated tool result. Input must be JSON: {"ref": "obs-1", "offset": 0}. Use next_offset from the previous call to continue.',
+                func=lambda x: asyncio.run(get_observation_func(x)),
+                coroutine=get_observation_func
             )
         ]
     
     def _create_react_agent(self):
+        from langchain.agents import AgentExecutor, create_react_agent
+        from langchain.prompts import PromptTemplate
+        
         react_prompt = PromptTemplate.from_template("""You are an AI assistant for document management with RBAC. Current user: {current_user}
 
 Tools available:
@@ -169,6 +298,10 @@ RULES:
 2. Action Input MUST be valid JSON
 3. For list_documents, use: {{}} as input
 4. Keep responses concise
+5. Large results are truncated with a "ref"; only call get_observation if the truncated part is needed
+6. Use known facts and recent conversation below instead of calling tools again when they answer the question. Facts marked as a truncated preview are incomplete; call read_document when you need the full text
+
+{memory}
 
 Question: {input}
 Thought: {agent_scratchpad}""")
@@ -188,26 +321,93 @@ Thought: {agent_scratchpad}""")
             return_intermediate_steps=False
         )
     
+    async def close(self):
+        if self.mcp_client:
+            await self.mcp_client.disconnect()
+            self.mcp_client = None
+        if self.memory:
+            self.memory.close()
+            self.memory = None
+
+async def get_runtime() -> AgentRuntime:
+    global _runtime, _runtime_lock
+    if _runtime is None:
+        if _runtime_lock is None:
+            _runtime_lock = asyncio.Lock()
+        async with _runtime_lock:
+            if _runtime is None:
+                runtime = AgentRuntime()
+                await runtime.initialize()
+                _runtime = runtime
+    return _runtime
+
+async def warm_up():
+    try:
+        await get_runtime()
+    except Exception as e:
+        logger.error(f"Agent warm-up failed, will retry on first query: {e}")
+
+async def shutdown_runtime():
+    global _runtime
+    if _runtime is not None:
+        await _runtime.close()
+        _runtime = None
+
+class LangChainMCPAgent:
+    def __init__(self, current_user: str = "alice", *, rbac_manager: "RBACManager",
+                 token_budget: int = 4000, max_observation_tokens: int = 500):
+        self.current_user = current_user
+        # Cached facts hold document content, so the user's read permission is
+        # checked against the live policy before they are shown each query.
+        self.rbac_manager = rbac_manager
+        self.token_budget = token_budget
+        self.max_observation_tokens = max_observation_tokens
+        self.runtime = None
+    
+    async def initialize(self):
+        self.runtime = await get_runtime()
+        logger.info(f"LangChain Agent initialized for user: {self.current_user}")
+    
     async def run(self, query: str) -> Dict[str, Any]:
+        compactor = ObservationCompactor(self.token_budget, self.max_observation_tokens)
+        token = _compactor.set(compactor)
+        user_token = _current_user.set(self.current_user)
         try:
-            result = await self.agent_executor.ainvoke({
+            versions = None
+            if self.rbac_manager.check_permission(self.current_user, "document", "read"):
+                versions = self.runtime.documents.current_versions()
+            else:
+                # Read access was revoked (e.g. by a policy reload).
+                self.runtime.memory.forget_facts(self.current_user)
+            memory = self.runtime.memory.render(self.current_user, versions)
+            result = await self.runtime.agent_executor.ainvoke({
                 "input": query,
-                "current_user": self.current_user
+                "current_user": self.current_user,
+                "memory": memory
             })
+            self.runtime.memory.add_turn(self.current_user, query, result.get("output", ""))
             
             return {
                 "status": "success",
                 "output": result.get("output", ""),
-                "user": self.current_user
+                "user": self.current_user,
+                "tokens_used": compactor.tokens_used,
+                "tokens_saved": compactor.tokens_saved
             }
         except Exception as e:
             logger.error(f"Agent execution error: {str(e)}")
             return {
                 "status": "error",
                 "message": str(e),
-                "user": self.current_user
+                "user": self.current_user,
+                "tokens_used": compactor.tokens_used,
+                "tokens_saved": compactor.tokens_saved
             }
+        finally:
+            _compactor.reset(token)
+            _current_user.reset(user_token)
+            logger.info(f"Observation tokens for {self.current_user}: used={compactor.tokens_used}, saved={compactor.tokens_saved}")
     
     async def cleanup(self):
-        if self.mcp_client:
-            await self.mcp_client.disconnect()
+        # The runtime is shared across users; shutdown_runtime releases it.
+        self.runtime = None
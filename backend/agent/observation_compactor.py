@@ -0,0 +1,146 @@
+import json
+import logging
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+PREVIEW_CHARS = 60
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def _fit(build: Callable[[int], Any], upper: int, max_chars: int) -> int:
+    # Largest n in [0, upper] whose encoded build(n) fits in max_chars. The
+    # encoded length grows with n, but escaping makes it nonlinear.
+    lo, hi = 0, upper
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if len(json.dumps(build(mid))) <= max_chars:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+class ObservationCompactor:
+    def __init__(self, token_budget: int = 4000, max_observation_tokens: int = 500):
+        self.token_budget = token_budget
+        self.max_observation_tokens = max_observation_tokens
+        self.payloads: Dict[str, str] = {}
+        self.tokens_used = 0
+        self.tokens_saved = 0
+    
+    def _emit(self, text: str, full_tokens: Optional[int] = None) -> str:
+        tokens = estimate_tokens(text)
+        self.tokens_used += tokens
+        if full_tokens is not None:
+            self.tokens_saved += max(full_tokens - tokens, 0)
+        return text
+    
+    def _budget_exhausted(self, result: Optional[Dict[str, Any]] = None) -> str:
+        note = "Token budget for this query is exhausted. Give your Final Answer now."
+        if result is None:
+            return self._emit(json.dumps({"status": "error", "message": note}))
+        
+        # The tool already ran, so report its real outcome and drop only the
+        # payload; telling the model a completed write failed invites retries.
+        compacted = {"status": result.get("status"), "data_omitted": True, "note": note}
+        if "message" in result:
+            compacted["message"] = result["message"]
+        return self._emit(json.dumps(compacted))
+    
+    def compact(self, result: Dict[str, Any]) -> str:
+        full = json.dumps(result)
+        full_tokens = estimate_tokens(full)
+        remaining = self.token_budget - self.tokens_used
+        
+        if remaining <= 0:
+            text = self._budget_exhausted(result)
+            self.tokens_saved += max(full_tokens - estimate_tokens(text), 0)
+            return text
+        
+        limit = min(self.max_observation_tokens, remaining)
+        if full_tokens <= limit:
+            return self._emit(full)
+        
+        ref = f"obs-{len(self.payloads) + 1}"
+        self.payloads[ref] = full
+        
+        compacted = {
+            "status": result.get("status"),
+            "truncated": True,
+            "ref": ref,
+            "note": "Partial result. Use get_observation with this ref for the rest."
+        }
+        if "message" in result:
+            compacted["message"] = result["message"]
+        
+        max_chars = limit * CHARS_PER_TOKEN
+        # Room left for the encoded data value once the envelope is in place.
+        envelope = len(json.dumps({**compacted, "data": None})) - len("null")
+        compacted["data"] = self._shrink(result.get("data"), max_chars - envelope)
+        
+        text = json.dumps(compacted)
+        if len(text) > max_chars:
+            del compacted["data"]
+            text = json.dumps(compacted)
+        
+        logger.info(f"Compacted observation {ref}: {full_tokens} -> {estimate_tokens(text)} tokens")
+        return self._emit(text, full_tokens)
+    
+    def _shrink(self, data: Any, max_chars: int) -> Any:
+        if isinstance(data, list):
+            # Lists (e.g. list_documents) keep whole items with short string
+            # fields, and drop trailing items until they fit.
+            items = []
+            for item in data:
+                if isinstance(item, dict):
+                    item = {k: (v[:PREVIEW_CHARS] if isinstance(v, str) else v) for k, v in item.items()}
+                items.append(item)
+            
+            shown = _fit(lambda n: {"total": len(items), "shown": n, "items": items[:n]}, len(items), max_chars)
+            return {"total": len(items), "shown": shown, "items": items[:shown]}
+        
+        if isinstance(data, dict):
+            # Single records (e.g. read_document) keep their metadata and
+            # truncate the longest string field to what is left.
+            strings = [k for k, v in data.items() if isinstance(v, str)]
+            if not strings:
+                return self._shrink(json.dumps(data), max_chars)
+            longest = max(strings, key=lambda k: len(data[k]))
+            
+            def build(n: int) -> Dict[str, Any]:
+                return {**data, longest: data[longest][:n]}
+            
+            return build(_fit(build, len(data[longest]), max_chars))
+        
+        if data is None:
+            return None
+        
+        text = data if isinstance(data, str) else json.dumps(data)
+        return text[:_fit(lambda n: text[:n], len(text), max_chars)]
+    
+    def fetch(self, ref: str, offset: int = 0) -> str:
+        if ref not in self.payloads:
+            return self._emit(json.dumps({"status": "error", "message": f"Unknown observation ref '{ref}'"}))
+        
+        remaining = self.token_budget - self.tokens_used
+        if remaining <= 0:
+            return self._budget_exhausted()
+        
+        payload = self.payloads[ref]
+        
+        def build(n: int) -> Dict[str, Any]:
+            end = offset + n
+            return {
+                "status": "success",
+                "ref": ref,
+                "chunk": payload[offset:end],
+                "next_offset": end if end < len(payload) else None
+            }
+        
+        # Size the chunk by its encoded length; the payload is already JSON,
+        # so its quotes and backslashes are escaped again.
+        max_chars = min(self.max_observation_tokens, remaining) * CHARS_PER_TOKEN
+        n = _fit(build, max(len(payload) - offset, 0), max_chars)
+        return self._emit(json.dumps(build(max(n, 1))))
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from pathlib import Path
@@ -6,7 +7,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
-from backend.agent.langchain_agent import LangChainMCPAgent
+from backend.agent.langchain_agent import LangChainMCPAgent, shutdown_runtime, warm_up
 from backend.rbac.rbac_manager import RBACManager
 from backend.storage.document_storage import DocumentStorage
 
@@ -32,6 +33,10 @@ document_storage = DocumentStorage()
 
 agents = {}
 
+# With warm start on, the shared agent runtime is built in the background as
+# soon as the server starts instead of on the first /agent/query.
+WARM_START = os.getenv("AGENT_WARM_START", "1") != "0"
+
 class QueryRequest(BaseModel):
     query: str
     user: str
@@ -41,6 +46,17 @@ class QueryResponse(BaseModel):
     output: Optional[str] = None
     message: Optional[str] = None
     user: str
+    tokens_used: Optional[int] = None
+    tokens_saved: Optional[int] = None
+
+class ReloadRequest(BaseModel):
+    user: str
+
+@app.on_event("startup")
+async def startup_event():
+    rbac_manager.start_watching()
+    if WARM_START:
+        app.state.warm_up_task = asyncio.create_task(warm_up())
 
 @app.get("/")
 async def root():
@@ -56,6 +72,16 @@ async def get_permissions(role: str):
     permissions = rbac_manager.get_permissions_for_role(role)
     return {"role": role, "permissions": permissions}
 
+@app.post("/rbac/reload")
+async def reload_policy(request: ReloadRequest):
+    if rbac_manager.get_user_role(request.user) != "admin":
+        raise HTTPException(status_code=403, detail=f"Permission denied: User '{request.user}' cannot reload policies")
+    
+    if not rbac_manager.reload():
+        raise HTTPException(status_code=500, detail="Policy reload failed, previous policy kept")
+    
+    return {"status": "success", "message": "Policy reloaded"}
+
 @app.get("/documents")
 async def list_documents():
     documents = document_storage.list_documents()
@@ -67,7 +93,7 @@ async def agent_query(request: QueryRequest):
         user = request.user
         
         if user not in agents:
-            agent = LangChainMCPAgent(current_user=user)
+            agent = LangChainMCPAgent(current_user=user, rbac_manager=rbac_manager)
             await agent.initialize()
             agents[user] = agent
         else:
@@ -79,7 +105,9 @@ async def agent_query(request: QueryRequest):
             status=result["status"],
             output=result.get("output"),
             message=result.get("message"),
-            user=user
+            user=user,
+            tokens_used=result.get("tokens_used"),
+            tokens_saved=result.get("tokens_saved")
         )
     
     except Exception as e:
@@ -90,6 +118,8 @@ async def agent_query(request: QueryRequest):
 async def shutdown_event():
     for agent in agents.values():
         await agent.cleanup()
+    await shutdown_runtime()
+    rbac_manager.stop_watching()
 
 if __name__ == "__main__":
     import uvicorn
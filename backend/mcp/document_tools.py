@@ -28,6 +28,14 @@ class DocumentTool:
                 )
                 return {"status": "success", "message": f"Document '{kwargs['doc_id']}' created", "data": result}
             
+            elif self.name == "get_version":
+                result = self.storage.get_version(kwargs["doc_id"], int(kwargs["version"]))
+                return {"status": "success", "data": result}
+            
+            elif self.name == "list_versions":
+                result = self.storage.list_versions(kwargs["doc_id"])
+                return {"status": "success", "data": result}
+            
             elif self.action == "read":
                 result = self.storage.read_document(kwargs["doc_id"])
                 return {"status": "success", "data": result}
@@ -54,6 +62,8 @@ class DocumentTools:
         self.read_tool = DocumentTool("read_document", "read", rbac_manager, storage)
         self.update_tool = DocumentTool("update_document", "update", rbac_manager, storage)
         self.delete_tool = DocumentTool("delete_document", "delete", rbac_manager, storage)
+        self.get_version_tool = DocumentTool("get_version", "read", rbac_manager, storage)
+        self.list_versions_tool = DocumentTool("list_versions", "read", rbac_manager, storage)
     
     def get_tool_schemas(self):
         return [
@@ -86,5 +96,20 @@ class DocumentTools:
                 "parameters": {
                     "doc_id": {"type": "string", "description": "Document ID to delete"}
                 }
+            },
+            {
+                "name": "get_version",
+                "description": "Read a previous version of a document",
+                "parameters": {
+                    "doc_id": {"type": "string", "description": "Document ID to read"},
+                    "version": {"type": "integer", "description": "Version number to read"}
+                }
+            },
+            {
+                "name": "list_versions",
+                "description": "List the retained versions of a document",
+                "parameters": {
+                    "doc_id": {"type": "string", "description": "Document ID to inspect"}
+                }
             }
         ]
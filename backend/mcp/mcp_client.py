@@ -11,22 +11,32 @@ class MCPClient:
         self.base_url = base_url.rstrip("/")
         self.http = None
         self.connected = False
+        self._connect_lock = None
     
     async def connect(self):
-        self.http = httpx.AsyncClient(timeout=30.0)
-        try:
-            response = await self.http.get(f"{self.base_url}/")
-            if response.status_code == 200:
-                self.connected = True
-                logger.info(f"Connected to MCP server at {self.base_url}")
-            else:
-                logger.error(f"Failed to connect to MCP server: {response.status_code}")
-        except Exception as e:
-            logger.error(f"Failed to connect to MCP server: {e}")
+        # The client is shared by every user's queries, so concurrent
+        # reconnects must reuse one httpx client instead of each opening one.
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.connected:
+                return
+            if self.http is None:
+                self.http = httpx.AsyncClient(timeout=30.0)
+            try:
+                response = await self.http.get(f"{self.base_url}/")
+                if response.status_code == 200:
+                    self.connected = True
+                    logger.info(f"Connected to MCP server at {self.base_url}")
+                else:
+                    logger.error(f"Failed to connect to MCP server: {response.status_code}")
+            except Exception as e:
+                logger.error(f"Failed to connect to MCP server: {e}")
     
     async def disconnect(self):
         if self.http:
             await self.http.aclose()
+            self.http = None
             self.connected = False
     
     async def list_tools(self):
@@ -76,6 +86,12 @@ class MCPClient:
     async def delete_document(self, user: str, doc_id: str) -> Dict[str, Any]:
         return await self._call_tool_http(user, "delete_document", {"doc_id": doc_id})
     
+    async def get_version(self, user: str, doc_id: str, version: int) -> Dict[str, Any]:
+        return await self._call_tool_http(user, "get_version", {"doc_id": doc_id, "version": version})
+    
+    async def list_versions(self, user: str, doc_id: str) -> Dict[str, Any]:
+        return await self._call_tool_http(user, "list_versions", {"doc_id": doc_id})
+    
     async def list_documents(self, user: str) -> Dict[str, Any]:
         return await self._call_tool_http(user, "list_documents", {})
     
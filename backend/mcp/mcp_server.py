@@ -20,6 +20,14 @@ rbac_manager = RBACManager("backend/rbac/model.conf", "backend/rbac/policy.csv")
 document_storage = DocumentStorage()
 document_tools = DocumentTools(rbac_manager, document_storage)
 
+@app.on_event("startup")
+async def startup_event():
+    rbac_manager.start_watching()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    rbac_manager.stop_watching()
+
 @app.get("/")
 async def root():
     return {"message": "MCP HTTP Server", "status": "running"}
@@ -30,6 +38,19 @@ async def list_tools():
         "tools": document_tools.get_tool_schemas()
     }
 
+@app.post("/rbac/reload")
+async def reload_policy(request: Request):
+    body = await request.json()
+    user = body.get("user")
+    
+    if rbac_manager.get_user_role(user) != "admin":
+        return {"status": "error", "message": f"Permission denied: User '{user}' cannot reload policies"}
+    
+    if not rbac_manager.reload():
+        return {"status": "error", "message": "Policy reload failed, previous policy kept"}
+    
+    return {"status": "success", "message": "Policy reloaded"}
+
 @app.post("/tools/call")
 async def call_tool_http(request: Request):
     body = await request.json()
@@ -61,6 +82,10 @@ async def call_tool_http(request: Request):
                 result = document_tools.update_tool.execute(user, **arguments)
             elif tool == "delete_document":
                 result = document_tools.delete_tool.execute(user, **arguments)
+            elif tool == "get_version":
+                result = document_tools.get_version_tool.execute(user, **arguments)
+            elif tool == "list_versions":
+                result = document_tools.list_versions_tool.execute(user, **arguments)
             elif tool == "list_documents":
                 result = {
                     "status": "success",
@@ -1,16 +1,123 @@
 import casbin
 import logging
+import os
+import threading
 from pathlib import Path
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Dense subject x resource x action bitset compiled from a casbin enforcer.
+# It is never mutated after construction, so readers can keep using a
+# reference while a reload swaps in a new one.
+class CompiledPolicy:
+    __slots__ = ("enforcer", "subjects", "resources", "actions", "bits")
+    
+    def __init__(self, enforcer: casbin.Enforcer):
+        self.enforcer = enforcer
+        subjects = set(enforcer.get_all_subjects())
+        for user, role in enforcer.get_named_grouping_policy("g"):
+            subjects.add(user)
+            subjects.add(role)
+        
+        self.subjects = {name: i for i, name in enumerate(sorted(subjects))}
+        self.resources = {name: i for i, name in enumerate(sorted(set(enforcer.get_all_objects())))}
+        self.actions = {name: i for i, name in enumerate(sorted(set(enforcer.get_all_actions())))}
+        
+        size = len(self.subjects) * len(self.resources) * len(self.actions)
+        self.bits = bytearray((size + 7) // 8)
+        
+        # Every combination of names that appear in the policy is decided by
+        # the enforcer once, so the bitset agrees with it whatever the matcher.
+        for subject in self.subjects:
+            for resource in self.resources:
+                for action in self.actions:
+                    if enforcer.enforce(subject, resource, action):
+                        index = self._index(subject, resource, action)
+                        self.bits[index >> 3] |= 1 << (index & 7)
+    
+    def _index(self, subject: str, resource: str, action: str) -> int:
+        return (self.subjects[subject] * len(self.resources) + self.resources[resource]) * len(self.actions) + self.actions[action]
+    
+    def allows(self, subject: str, resource: str, action: str) -> bool:
+        if subject not in self.subjects or resource not in self.resources or action not in self.actions:
+            # Names outside the policy are only denied by an equality matcher;
+            # patterns such as keyMatch or "*" objects can still allow them.
+            return self.enforcer.enforce(subject, resource, action)
+        index = self._index(subject, resource, action)
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
 class RBACManager:
     def __init__(self, model_path: str, policy_path: str):
-        self.enforcer = casbin.Enforcer(model_path, policy_path)
+        self.model_path = model_path
+        self.policy_path = policy_path
+        self._reload_lock = threading.Lock()
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        
+        self._file_stamp = self._stat_files()
+        self.policy = CompiledPolicy(casbin.Enforcer(model_path, policy_path))
         logger.info(f"RBAC Manager initialized with model: {model_path}, policy: {policy_path}")
     
+    def _stat_files(self) -> Tuple:
+        stamp = []
+        for path in (self.model_path, self.policy_path):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+    
+    def reload(self) -> bool:
+        with self._reload_lock:
+            stamp = self._stat_files()
+            try:
+                enforcer = casbin.Enforcer(self.model_path, self.policy_path)
+                policy = CompiledPolicy(enforcer)
+            except Exception as e:
+                # Remember the broken files so the watcher only retries once
+                # they change again.
+                self._file_stamp = stamp
+                logger.error(f"Failed to reload RBAC policy, keeping the current one: {e}")
+                return False
+            
+            # The enforcer travels with its compiled policy, so a single
+            # assignment swaps both, and in-flight checks keep the old pair.
+            self.policy = policy
+            self._file_stamp = stamp
+        
+        logger.info(f"RBAC policy reloaded from {self.policy_path}")
+        return True
+    
+    def start_watching(self, interval: float = 2.0):
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        
+        self._watch_stop = threading.Event()
+        
+        def watch(stop: threading.Event):
+            while not stop.wait(interval):
+                if self._stat_files() != self._file_stamp:
+                    self.reload()
+        
+        self._watch_thread = threading.Thread(target=watch, args=(self._watch_stop,), name="rbac-policy-watcher", daemon=True)
+        self._watch_thread.start()
+        logger.info(f"Watching RBAC policy files every {interval}s")
+    
+    def stop_watching(self):
+        if self._watch_stop:
+            self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join()
+            self._watch_thread = None
+    
+    @property
+    def enforcer(self) -> casbin.Enforcer:
+        return self.policy.enforcer
+    
     def check_permission(self, user: str, resource: str, action: str) -> bool:
-        has_permission = self.enforcer.enforce(user, resource, action)
+        has_permission = self.policy.allows(user, resource, action)
         
         if has_permission:
             logger.info(f"Permission granted: {user} can {action} on {resource}")
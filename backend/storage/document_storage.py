@@ -1,5 +1,7 @@
 import json
 import logging
+import os
+import shutil
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -7,10 +9,20 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 class DocumentStorage:
-    def __init__(self, storage_dir: str = "data/documents"):
+    def __init__(self, storage_dir: str = "data/documents", snapshot_interval: int = 10, max_versions: int = 50):
+        if snapshot_interval < 1:
+            raise ValueError("snapshot_interval must be at least 1")
+        if max_versions < 1:
+            raise ValueError("max_versions must be at least 1")
+        
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.index_file = self.storage_dir / "index.json"
+        self.versions_dir = self.storage_dir / "versions"
+        self.snapshot_interval = snapshot_interval
+        self.max_versions = max_versions
+        self._index_stamp = None
+        self._versions: Dict[str, int] = {}
         self._load_index()
     
     def _load_index(self):
@@ -22,12 +34,123 @@ class DocumentStorage:
             self._save_index()
     
     def _save_index(self):
-        with open(self.index_file, 'w') as f:
+        # Other processes poll the index, so replace it atomically rather than
+        # letting them read a half-written file.
+        tmp_file = self.index_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
             json.dump(self.index, f, indent=2)
+        os.replace(tmp_file, self.index_file)
+    
+    def current_versions(self) -> Dict[str, int]:
+        # Re-reads the index only when it changed on disk, so callers in other
+        # processes can check document versions on every request. _save_index
+        # replaces the file, so the inode changes on every write even when the
+        # size and mtime do not. The returned dict is shared; do not modify it.
+        try:
+            stat = self.index_file.stat()
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return {}
+        if stamp != self._index_stamp:
+            self._load_index()
+            self._versions = {doc_id: entry.get("version", 1) for doc_id, entry in self.index.items()}
+            self._index_stamp = stamp
+        return self._versions
+    
+    # Version history lives in versions/<doc_id>/ as segment files named after
+    # their first version. Each segment starts with a full snapshot followed by
+    # deltas, so an update only appends one small record and retention drops
+    # whole segments without rewriting anything. The latest content always
+    # stays in <doc_id>.json.
+    
+    def _history_dir(self, doc_id: str) -> Path:
+        # doc_id comes straight from tool arguments; never let it address a
+        # path outside the versions directory. IDs such as "v1..2" are fine,
+        # only "." and ".." as a whole and path separators are not.
+        if doc_id in ("", ".", "..") or "/" in doc_id or "\\" in doc_id:
+            raise ValueError(f"Invalid document ID '{doc_id}'")
+        history_dir = self.versions_dir / doc_id
+        if history_dir.resolve().parent != self.versions_dir.resolve():
+            raise ValueError(f"Invalid document ID '{doc_id}'")
+        return history_dir
+    
+    def _segments(self, doc_id: str) -> List[Path]:
+        history_dir = self._history_dir(doc_id)
+        if not history_dir.exists():
+            return []
+        return sorted(history_dir.glob("*.jsonl"))
+    
+    def _append_version(self, doc_id: str, record: Dict, new_segment: bool):
+        history_dir = self._history_dir(doc_id)
+        history_dir.mkdir(parents=True, exist_ok=True)
+        
+        if new_segment:
+            segment = history_dir / f"{record['version']:08d}.jsonl"
+        else:
+            segment = self._segments(doc_id)[-1]
+        
+        with open(segment, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+    
+    def _prune_versions(self, doc_id: str, current_version: int):
+        segments = self._segments(doc_id)
+        while len(segments) > 1 and current_version - int(segments[1].stem) + 1 >= self.max_versions:
+            segments.pop(0).unlink()
+    
+    @staticmethod
+    def _make_delta(old: str, new: str) -> List:
+        # Binary search on slice comparisons keeps the scan in C, which matters
+        # for small edits to large documents.
+        limit = min(len(old), len(new))
+        lo, hi = 0, limit
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old[:mid] == new[:mid]:
+                lo = mid
+            else:
+                hi = mid - 1
+        prefix = lo
+        
+        lo, hi = 0, limit - prefix
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old[len(old) - mid:] == new[len(new) - mid:]:
+                lo = mid
+            else:
+                hi = mid - 1
+        suffix = lo
+        
+        return [prefix, suffix, new[prefix:len(new) - suffix]]
+    
+    @staticmethod
+    def _apply_delta(old: str, delta: List) -> str:
+        prefix, suffix, text = delta
+        return old[:prefix] + text + old[len(old) - suffix:]
+    
+    def _record_version(self, doc_id: str, version: int, old_content: Optional[str], content: str, author: str, timestamp: str):
+        record = {"version": version, "author": author, "timestamp": timestamp}
+        segments = self._segments(doc_id)
+        
+        new_segment = True
+        if old_content is not None and segments:
+            delta = self._make_delta(old_content, content)
+            segment_length = version - int(segments[-1].stem)
+            # Fall back to a snapshot when the segment is full or the edit
+            # rewrites most of the document anyway.
+            if segment_length < self.snapshot_interval and len(delta[2]) * 2 < len(content):
+                record["delta"] = delta
+                new_segment = False
+        
+        if new_segment:
+            record["content"] = content
+        
+        self._append_version(doc_id, record, new_segment)
+        self._prune_versions(doc_id, version)
     
     def create_document(self, doc_id: str, content: str, created_by: str) -> Dict:
         if doc_id in self.index:
             raise ValueError(f"Document '{doc_id}' already exists")
+        history_dir = self._history_dir(doc_id)
         
         doc_file = self.storage_dir / f"{doc_id}.json"
         doc_data = {
@@ -35,15 +158,21 @@ class DocumentStorage:
             "content": content,
             "created_by": created_by,
             "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": datetime.utcnow().isoformat(),
+            "updated_by": created_by,
+            "version": 1
         }
         
         with open(doc_file, 'w') as f:
             json.dump(doc_data, f, indent=2)
         
+        shutil.rmtree(history_dir, ignore_errors=True)
+        self._record_version(doc_id, 1, None, content, created_by, doc_data["created_at"])
+        
         self.index[doc_id] = {
             "created_by": created_by,
-            "created_at": doc_data["created_at"]
+            "created_at": doc_data["created_at"],
+            "version": 1
         }
         self._save_index()
         
@@ -66,13 +195,27 @@ class DocumentStorage:
             raise ValueError(f"Document '{doc_id}' not found")
         
         doc_data = self.read_document(doc_id)
+        old_content = doc_data["content"]
+        
+        if "version" not in doc_data or not self._segments(doc_id):
+            # Documents written before versioning existed start their history
+            # with a snapshot of the content they had at that point.
+            doc_data["version"] = doc_data.get("version", 1)
+            self._record_version(doc_id, doc_data["version"], None, old_content, doc_data.get("updated_by", doc_data["created_by"]), doc_data["updated_at"])
+        
         doc_data["content"] = content
         doc_data["updated_at"] = datetime.utcnow().isoformat()
+        doc_data["updated_by"] = updated_by
+        doc_data["version"] += 1
         
         doc_file = self.storage_dir / f"{doc_id}.json"
         with open(doc_file, 'w') as f:
             json.dump(doc_data, f, indent=2)
         
+        self._record_version(doc_id, doc_data["version"], old_content, content, updated_by, doc_data["updated_at"])
+        self.index[doc_id]["version"] = doc_data["version"]
+        self._save_index()
+        
         logger.info(f"Document '{doc_id}' updated by {updated_by}")
         return doc_data
     
@@ -80,8 +223,10 @@ class DocumentStorage:
         if doc_id not in self.index:
             raise ValueError(f"Document '{doc_id}' not found")
         
+        history_dir = self._history_dir(doc_id)
         doc_file = self.storage_dir / f"{doc_id}.json"
         doc_file.unlink()
+        shutil.rmtree(history_dir, ignore_errors=True)
         
         del self.index[doc_id]
         self._save_index()
@@ -89,6 +234,73 @@ class DocumentStorage:
         logger.info(f"Document '{doc_id}' deleted by {deleted_by}")
         return {"status": "success", "message": f"Document '{doc_id}' deleted"}
     
+    def get_version(self, doc_id: str, version: int) -> Dict:
+        doc_data = self.read_document(doc_id)
+        current_version = doc_data.get("version", 1)
+        
+        if version == current_version:
+            return {
+                "id": doc_id,
+                "version": version,
+                "content": doc_data["content"],
+                "author": doc_data.get("updated_by", doc_data["created_by"]),
+                "timestamp": doc_data["updated_at"]
+            }
+        
+        segments = [s for s in self._segments(doc_id) if int(s.stem) <= version]
+        if version > current_version or not segments:
+            raise ValueError(f"Version {version} of document '{doc_id}' not found")
+        
+        content = None
+        with open(segments[-1], 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                if "content" in record:
+                    content = record["content"]
+                else:
+                    content = self._apply_delta(content, record["delta"])
+                
+                if record["version"] == version:
+                    return {
+                        "id": doc_id,
+                        "version": version,
+                        "content": content,
+                        "author": record["author"],
+                        "timestamp": record["timestamp"]
+                    }
+        
+        raise ValueError(f"Version {version} of document '{doc_id}' not found")
+    
+    def list_versions(self, doc_id: str) -> List[Dict]:
+        if doc_id not in self.index:
+            raise ValueError(f"Document '{doc_id}' not found")
+        
+        versions = []
+        for segment in self._segments(doc_id):
+            with open(segment, 'r') as f:
+                for line in f:
+                    record = json.loads(line)
+                    versions.append({
+                        "version": record["version"],
+                        "author": record["author"],
+                        "timestamp": record["timestamp"],
+                        "snapshot": "content" in record
+                    })
+        
+        if not versions:
+            # Documents written before versioning existed have no history
+            # until their first update; their current content is the only
+            # version, and get_version serves it from <doc_id>.json.
+            doc_data = self.read_document(doc_id)
+            versions.append({
+                "version": doc_data.get("version", 1),
+                "author": doc_data.get("updated_by", doc_data["created_by"]),
+                "timestamp": doc_data["updated_at"],
+                "snapshot": True
+            })
+        
+        return versions
+    
     def list_documents(self) -> List[Dict]:
         self._load_index()
         documents = []
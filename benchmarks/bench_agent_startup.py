@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_time(module: str) -> float:
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=PROJECT_ROOT)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+async def agent_latencies(users: int):
+    from backend.agent.langchain_agent import LangChainMCPAgent, shutdown_runtime
+    from backend.rbac.rbac_manager import RBACManager
+
+    rbac_manager = RBACManager(str(PROJECT_ROOT / "backend/rbac/model.conf"), str(PROJECT_ROOT / "backend/rbac/policy.csv"))
+
+    start = time.perf_counter()
+    agent = LangChainMCPAgent(current_user="user-0", rbac_manager=rbac_manager)
+    await agent.initialize()
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(1, users + 1):
+        agent = LangChainMCPAgent(current_user=f"user-{i}", rbac_manager=rbac_manager)
+        await agent.initialize()
+    warm = (time.perf_counter() - start) / users
+
+    await shutdown_runtime()
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent startup and first-request latency")
+    parser.add_argument("--users", type=int, default=20, help="number of per-user agents to create after warm-up")
+    args = parser.parse_args()
+
+    # Building ChatOpenAI requires a key but makes no API calls.
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    # Point the runtime at a closed port so it never talks to a live MCP
+    # server; the failed connect probe is part of what a cold start pays.
+    os.environ["MCP_SERVER_URL"] = "http://127.0.0.1:9"
+
+    agent_module = import_time("backend.agent.langchain_agent")
+    langchain_stack = import_time("langchain.agents, langchain.prompts, langchain_openai")
+
+    # The runtime creates data/memory.db and data/documents relative to the
+    # working directory; keep them out of the app's real data.
+    sys.path.insert(0, str(PROJECT_ROOT))
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            cold, warm = asyncio.run(agent_latencies(args.users))
+        finally:
+            os.chdir(PROJECT_ROOT)
+
+    print(f"import agent module:          {agent_module * 1000:.1f} ms")
+    print(f"import langchain stack:       {langchain_stack * 1000:.1f} ms (previously paid at process start)")
+    print(f"first agent, cold runtime:    {cold * 1000:.1f} ms (first /agent/query with AGENT_WARM_START=0)")
+    print(f"per-user agent, warm runtime: {warm * 1000:.3f} ms (first /agent/query after warm-up)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from backend.agent.conversation_memory import ConversationMemory, ALL_DOCUMENTS, documents_signature
+from backend.rbac.rbac_manager import RBACManager
+from backend.storage.document_storage import DocumentStorage
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+USERS = ["alice", "bob", "charlie"]
+
+
+def text(rng: random.Random, size: int) -> str:
+    return "".join(rng.choice(string.ascii_letters + " ") for _ in range(size))
+
+
+def percentile(timings: list, fraction: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-turn conversation memory read path")
+    parser.add_argument("--docs", type=int, default=2000, help="documents in the index")
+    parser.add_argument("--turns", type=int, default=2000, help="turns recorded per user")
+    parser.add_argument("--reads", type=int, default=2000, help="number of memory reads to time")
+    parser.add_argument("--write-every", type=int, default=5, help="rewrite the index before every Nth read")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rbac_manager = RBACManager(str(PROJECT_ROOT / "backend/rbac/model.conf"), str(PROJECT_ROOT / "backend/rbac/policy.csv"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The MCP server owns the writer; the API process only reads the index.
+        writer = DocumentStorage(str(Path(tmp) / "documents"))
+        reader = DocumentStorage(str(Path(tmp) / "documents"))
+        memory = ConversationMemory(str(Path(tmp) / "memory.db"))
+
+        # Twenty real documents get edited; the rest only pad the index.
+        for i in range(20):
+            writer.create_document(f"doc-{i}", text(rng, 200), "alice")
+        for i in range(20, args.docs):
+            writer.index[f"doc-{i}"] = {"created_by": "alice", "created_at": "2026-01-01T00:00:00", "version": 1}
+        writer._save_index()
+
+        start = time.perf_counter()
+        for turn in range(args.turns):
+            versions = reader.current_versions()
+            for user in USERS:
+                memory.add_turn(user, text(rng, 80), text(rng, 400))
+                if turn % 5 == 0:
+                    doc_id = f"doc-{rng.randrange(20)}"
+                    memory.remember_fact(user, f"read:{doc_id}", doc_id, str(versions[doc_id]), text(rng, 300))
+                    memory.remember_fact(user, "list", ALL_DOCUMENTS, documents_signature(versions), text(rng, 100))
+        write_time = (time.perf_counter() - start) / (args.turns * len(USERS))
+
+        # Time exactly what LangChainMCPAgent.run does before each query:
+        # permission check, document versions, then render.
+        unchanged, after_write = [], []
+        rendered = 0
+        for i in range(args.reads):
+            wrote = i % args.write_every == 0
+            if wrote:
+                doc_id = f"doc-{rng.randrange(20)}"
+                writer.update_document(doc_id, text(rng, 200), "bob")
+            user = rng.choice(USERS)
+
+            start = time.perf_counter()
+            versions = None
+            if rbac_manager.check_permission(user, "document", "read"):
+                versions = reader.current_versions()
+            rendered = max(rendered, len(memory.render(user, versions)))
+            elapsed = time.perf_counter() - start
+
+            (after_write if wrote else unchanged).append(elapsed)
+
+        (stored,) = memory._conn.execute("SELECT COUNT(*) FROM turns WHERE user = ?", (USERS[0],)).fetchone()
+        memory.close()
+
+    every = unchanged + after_write
+    print(f"documents in index:        {args.docs}")
+    print(f"turns retained per user:   {stored} (max_bytes_per_user={memory.max_bytes_per_user})")
+    print(f"turn write latency:        {write_time * 1000:.3f} ms")
+    print(f"read, index unchanged:     p50 {percentile(unchanged, 0.5):.3f} ms, p99 {percentile(unchanged, 0.99):.3f} ms")
+    print(f"read, right after a write: p50 {percentile(after_write, 0.5):.3f} ms, p99 {percentile(after_write, 0.99):.3f} ms")
+    print(f"read, all (1 write per {args.write_every}): p50 {percentile(every, 0.5):.3f} ms, p99 {percentile(every, 0.99):.3f} ms")
+    print(f"largest rendered memory:   {rendered} chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from backend.storage.document_storage import DocumentStorage
+
+
+def file_stats(path: Path) -> dict:
+    stats = {}
+    for p in path.rglob("*"):
+        if p.is_file():
+            stat = p.stat()
+            stats[p] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def bytes_written(before: dict, after: dict) -> int:
+    # History segments (.jsonl) are append-only, so only their growth was
+    # written. Any other file that changed (<doc_id>.json, index.json) was
+    # rewritten in full.
+    total = 0
+    for p, stat in after.items():
+        old = before.get(p)
+        if old == stat:
+            continue
+        if p.suffix == ".jsonl" and old is not None and old[0] == stat[0] and stat[2] >= old[2]:
+            total += stat[2] - old[2]
+        else:
+            total += stat[2]
+    return total
+
+
+def small_edit(content: str, rng: random.Random) -> str:
+    pos = rng.randrange(len(content))
+    return content[:pos] + rng.choice(string.ascii_letters) + content[pos + 1:]
+
+
+def bench_latest_read(storage: DocumentStorage, doc_id: str, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        storage.read_document(doc_id)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document version history")
+    parser.add_argument("--size", type=int, default=200_000, help="document size in characters")
+    parser.add_argument("--edits", type=int, default=200, help="number of small edits to apply")
+    parser.add_argument("--reads", type=int, default=200, help="number of latest-version reads")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    content = "".join(rng.choice(string.ascii_letters + " \n") for _ in range(args.size))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = DocumentStorage(tmp)
+        storage.create_document("bench", content, "alice")
+
+        short_history = bench_latest_read(storage, "bench", args.reads)
+
+        history_dir = storage.versions_dir / "bench"
+        history_bytes = 0
+        total_bytes = 0
+        update_time = 0.0
+        for _ in range(args.edits):
+            content = small_edit(content, rng)
+            before = file_stats(storage.storage_dir)
+            start = time.perf_counter()
+            storage.update_document("bench", content, "alice")
+            update_time += time.perf_counter() - start
+            after = file_stats(storage.storage_dir)
+            total_bytes += bytes_written(before, after)
+            history_bytes += bytes_written(
+                {p: s for p, s in before.items() if history_dir in p.parents},
+                {p: s for p, s in after.items() if history_dir in p.parents}
+            )
+        update_time /= args.edits
+
+        long_history = bench_latest_read(storage, "bench", args.reads)
+
+        versions = storage.list_versions("bench")
+        oldest = versions[0]["version"]
+        start = time.perf_counter()
+        storage.get_version("bench", oldest + storage.snapshot_interval - 1)
+        worst_old_read = time.perf_counter() - start
+
+        print(f"document size:               {args.size} chars")
+        print(f"edits applied:               {args.edits}")
+        print(f"retained versions:           {len(versions)} (max_versions={storage.max_versions})")
+        print(f"history bytes per edit:      {history_bytes / args.edits:.0f} "
+              f"(snapshot every {storage.snapshot_interval})")
+        print(f"total bytes per edit:        {total_bytes / args.edits:.0f} "
+              f"(includes rewriting <doc_id>.json and index.json; document is {len(content)} chars)")
+        print(f"update latency:              {update_time * 1000:.3f} ms")
+        print(f"latest read, 1 version:      {short_history * 1000:.3f} ms")
+        print(f"latest read, {args.edits + 1} versions:".ljust(29) + f"{long_history * 1000:.3f} ms")
+        print(f"worst-case old version read: {worst_old_read * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()